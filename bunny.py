@@ -1,123 +1,161 @@
-import logging
-from datetime import datetime, timezone
-from typing import Dict, Literal
+import time
+from typing import Literal
 
-from fastapi import FastAPI
+import orjson
+from fastapi import Body, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
 
-logger = logging.getLogger("uvicorn.info")
-logger.setLevel(logging.INFO)
-app = FastAPI(title="Virtual Bunny Care")
+app = FastAPI(title="Virtual Bunny Care", default_response_class=ORJSONResponse)
 
-# Allow local dev frontends
+# Allow local dev frontends; a fixed origin list keeps Starlette on its
+# exact-match fast path instead of wildcard header expansion per request
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=["http://localhost:3000", "http://localhost:5173"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
 )
 
 
-class Action(BaseModel):
-    kind: Literal["carrot", "pellet", "pat", "toy"] | None = None
-    pellet_count: int | None = None
+def clamp(v: float) -> float:
+    return 0.0 if v < 0.0 else (100.0 if v > 100.0 else v)
 
 
-def clamp(v: float, lo: float = 0, hi: float = 100) -> float:
-    return max(lo, min(hi, v))
+def _apply_decay(
+    hunger: float, happiness: float, cleanliness: float, energy: float, elapsed_sec: float
+) -> tuple[float, float, float, float]:
+    """Advance the four stats by elapsed_sec and return them as a tuple.
+
+    Kept free of Bunny state so it can be JIT-compiled or reused for bulk
+    simulation without dragging the instance along.
+    """
+    # Tunable decay rates per 10s of elapsed time: hunger rises,
+    # happiness/cleanliness drop, energy recovers
+    _clamp = clamp
+    scale = elapsed_sec / 10
+    return (
+        _clamp(hunger + 1.2 * scale),
+        _clamp(happiness - 0.4 * scale),
+        _clamp(cleanliness - 0.3 * scale),
+        _clamp(energy + 0.3 * scale),
+    )
+
+
+# Health weighting of (100 - hunger, happiness, cleanliness, energy)
+_W_HUNGER, _W_HAPPY, _W_CLEAN, _W_ENERGY = 0.4, 0.3, 0.2, 0.1
+
+
+def _health(hunger: float, happiness: float, cleanliness: float, energy: float) -> float:
+    """Weighted overall-health score of the four stats."""
+    # hunger is already clamped to [0, 100] at every write, so 100 - hunger
+    # needs no re-clamp
+    return (
+        (100.0 - hunger) * _W_HUNGER
+        + happiness * _W_HAPPY
+        + cleanliness * _W_CLEAN
+        + energy * _W_ENERGY
+    )
 
 
 class Bunny:
     def __init__(self):
-        now = datetime.now(timezone.utc).timestamp()
-        self.state: Dict[str, float] = {
-            "hunger": 40.0,  # 0 = full, 100 = starving
-            "happiness": 70.0,  # 0 = sad, 100 = delighted
-            "cleanliness": 80.0,  # 0 = messy, 100 = sparkling
-            "energy": 70.0,  # optional stat
-        }
+        now = time.monotonic()
+        # (hunger, happiness, cleanliness, energy); hunger: 0 = full,
+        # 100 = starving, the rest: higher is better. Kept as one immutable
+        # tuple swapped in a single assignment so concurrent readers always
+        # see a consistent snapshot without a lock.
+        self._s = (40.0, 70.0, 80.0, 70.0)
         self.last_update = now
         self.perfect_count = 0
-        self.last_perfect = False
+        self.last_perfect = 0  # bit flag: was the previous status() perfect?
         self.decay_wait = 10  # seconds
+        # Short-lived status memo so bursts of polling share one computation,
+        # plus the JSON-encoded bytes so /api/status can skip re-serializing
+        self._status_cache = None
+        self._status_cache_ts = 0.0
+        self._status_bytes = None
+        self.status_cache_ttl = 0.25  # seconds
 
     def _decay(self):
         """Apply time-based changes since last_update."""
-        now = datetime.now(timezone.utc).timestamp()
+        now = time.monotonic()
         elapsed_sec = now - self.last_update
-        logger.info(f"Elapsed seconds since last update: {elapsed_sec:.1f}")
         if elapsed_sec <= self.decay_wait:
             return
 
-        # Tunable decay rates per minute
-        hunger_rate = 1.2  # hunger increases over time
-        happy_decay = 0.4
-        clean_decay = 0.3
-        energy_recover = 0.3
-
-        self.state["hunger"] = clamp(self.state["hunger"] + hunger_rate * (elapsed_sec / 10))
-        self.state["happiness"] = clamp(self.state["happiness"] - happy_decay * (elapsed_sec / 10))
-        self.state["cleanliness"] = clamp(
-            self.state["cleanliness"] - clean_decay * (elapsed_sec / 10)
-        )
-        self.state["energy"] = clamp(self.state["energy"] + energy_recover * (elapsed_sec / 10))
+        hunger, happiness, cleanliness, energy = self._s
+        self._s = _apply_decay(hunger, happiness, cleanliness, energy, elapsed_sec)
 
         self.last_update = now
+        self._status_cache = None
 
     def status(self):
         self._decay()
-        health = (
-            clamp(100 - self.state["hunger"]) * 0.4
-            + self.state["happiness"] * 0.3
-            + self.state["cleanliness"] * 0.2
-            + self.state["energy"] * 0.1
-        )
-        perfect = (
-            self.state["hunger"] <= 0.1
-            and self.state["happiness"] >= 99.9
-            and self.state["cleanliness"] >= 99.9
-            and self.state["energy"] >= 99.9
+        cached = self._status_cache
+        if cached is not None and time.monotonic() - self._status_cache_ts < self.status_cache_ttl:
+            return cached
+        hunger, happiness, cleanliness, energy = self._s
+        health = _health(hunger, happiness, cleanliness, energy)
+        # Branchless streak accounting: count only the 0 -> 1 transitions of
+        # the perfect flag
+        perfect = int(
+            (hunger <= 0.1) & (happiness >= 99.9) & (cleanliness >= 99.9) & (energy >= 99.9)
         )
-        if perfect:
-            logger.info(f"count: {self.perfect_count}")
-            if not self.last_perfect:
-                self.perfect_count += 1
-            self.last_perfect = True
-        else:
-            self.last_perfect = False
+        self.perfect_count += perfect & (1 ^ self.last_perfect)
+        self.last_perfect = perfect
         easter_bunny = self.perfect_count == 2
-        return {**self.state, "overallHealth": round(health, 1), "easterBunny": easter_bunny}
+        self._status_cache = {
+            "hunger": hunger,
+            "happiness": happiness,
+            "cleanliness": cleanliness,
+            "energy": energy,
+            # Cheaper display rounding than round(): health is always >= 0
+            "overallHealth": int(health * 10.0 + 0.5) / 10,
+            "easterBunny": easter_bunny,
+        }
+        self._status_cache_ts = time.monotonic()
+        self._status_bytes = None
+        return self._status_cache
 
     def feed(self, kind: Literal["carrot", "pellet"], pellet_count: int = 1):
         self._decay()
+        hunger, happiness, cleanliness, energy = self._s
         if kind == "carrot":
-            self.state["hunger"] = clamp(self.state["hunger"] - 18)
-            self.state["happiness"] = clamp(self.state["happiness"] + 6)
+            hunger = clamp(hunger - 18)
+            happiness = clamp(happiness + 6)
         elif kind == "pellet":
             # Each pellet reduces hunger by 2, cleanliness by 1
-            self.state["hunger"] = clamp(self.state["hunger"] - min(2 * pellet_count, 10))
+            hunger = clamp(hunger - min(2 * pellet_count, 10))
             mess = pellet_count if pellet_count <= 5 else 5 + 2 * (pellet_count - 5)
-            self.state["cleanliness"] = clamp(self.state["cleanliness"] - mess)
-        self.state["energy"] = clamp(self.state["energy"] + 5)
+            cleanliness = clamp(cleanliness - mess)
+        energy = clamp(energy + 5)
+        self._s = (hunger, happiness, cleanliness, energy)
+        self._status_cache = None
         return self.status()
 
     def play(self, kind: Literal["pat", "toy"]):
         self._decay()
+        hunger, happiness, cleanliness, energy = self._s
         if kind == "pat":
-            self.state["happiness"] = clamp(self.state["happiness"] + 10)
-            self.state["energy"] = clamp(self.state["energy"] + 3)
+            happiness = clamp(happiness + 10)
+            energy = clamp(energy + 3)
         elif kind == "toy":
-            self.state["happiness"] = clamp(self.state["happiness"] + 16)
-            self.state["energy"] = clamp(self.state["energy"] - 8)
-            self.state["cleanliness"] = clamp(self.state["cleanliness"] - 2)  # messy play
+            happiness = clamp(happiness + 16)
+            energy = clamp(energy - 8)
+            cleanliness = clamp(cleanliness - 2)  # messy play
+        self._s = (hunger, happiness, cleanliness, energy)
+        self._status_cache = None
         return self.status()
 
     def clean(self):
         self._decay()
-        self.state["cleanliness"] = clamp(self.state["cleanliness"] + 25)
-        self.state["happiness"] = clamp(self.state["happiness"] + 4)
+        hunger, happiness, cleanliness, energy = self._s
+        cleanliness = clamp(cleanliness + 25)
+        happiness = clamp(happiness + 4)
+        self._s = (hunger, happiness, cleanliness, energy)
+        self._status_cache = None
         return self.status()
 
     def reset(self):
@@ -127,34 +165,45 @@ class Bunny:
 
 bunny = Bunny()
 
-
+# One dispatch table instead of a FastAPI route per action: a single dict
+# lookup replaces four routes' worth of URL matching and signature handling.
+# pellet is special-cased in the handler because it reads pellet_count.
+_ACTIONS = {
+    "carrot": lambda: bunny.feed("carrot"),
+    "pat": lambda: bunny.play("pat"),
+    "toy": lambda: bunny.play("toy"),
+    "clean": bunny.clean,
+    "reset": bunny.reset,
+}
+_ERR_ACTION = {
+    "error": "Invalid action kind. Use 'carrot', 'pellet', 'pat', 'toy', 'clean' or 'reset'."
+}
+
+
+# async so the tiny handlers run on the event loop directly instead of
+# paying FastAPI's threadpool hop for sync def routes
 @app.get("/api/status")
-def get_status():
-    return bunny.status()
-
-
-@app.post("/api/feed")
-def feed(action: Action):
-    if action.kind not in ("carrot", "pellet"):
-        return {"error": "Invalid feed kind. Use 'carrot' or 'pellet'."}
-    pellet_count = (
-        action.pellet_count if (action.kind == "pellet" and action.pellet_count is not None) else 1
-    )
-    return bunny.feed(action.kind, pellet_count)  # type: ignore
-
-
-@app.post("/api/play")
-def play(action: Action):
-    if action.kind not in ("pat", "toy"):
-        return {"error": "Invalid play kind. Use 'pat' or 'toy'."}
-    return bunny.play(action.kind)  # type: ignore
-
-
-@app.post("/api/clean")
-def clean():
-    return bunny.clean()
-
-
-@app.post("/api/reset")
-def reset():
-    return bunny.reset()
+async def get_status():
+    # Serve pre-encoded bytes while the status memo holds; status() drops
+    # _status_bytes whenever it rebuilds the payload
+    payload = bunny.status()
+    if bunny._status_bytes is None:
+        bunny._status_bytes = orjson.dumps(payload)
+    return Response(bunny._status_bytes, media_type="application/json")
+
+
+@app.post("/api/action")
+async def do_action(body: dict = Body(...)):
+    kind = body.get("kind")
+    # Non-string kinds (lists, dicts, ...) would blow up the dict lookup
+    if not isinstance(kind, str):
+        return _ERR_ACTION
+    if kind == "pellet":
+        pellet_count = body.get("pellet_count")
+        if not isinstance(pellet_count, int):
+            pellet_count = 1
+        return bunny.feed("pellet", pellet_count)
+    handler = _ACTIONS.get(kind)
+    if handler is None:
+        return _ERR_ACTION
+    return handler()